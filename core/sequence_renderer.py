@@ -4,15 +4,33 @@ Sequence Renderer for Sequence Completion Tasks
 Renders sequences of elements (numbers, shapes, colors, positions, mixed) for visualization.
 """
 
+import importlib.util
+import re
+from math import sqrt
 import numpy as np
-from typing import List, Any, Optional, Tuple
-from PIL import Image
-import io
+from typing import Any, Callable, List, Optional, Tuple
+from functools import lru_cache
+from PIL import Image, ImageDraw
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle, Rectangle, RegularPolygon, Polygon, FancyArrowPatch
-from pathlib import Path
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_hex
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.path import Path
+from matplotlib.transforms import IdentityTransform
+
+# Numba is optional: used to JIT polygon vertex generation when installed
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+if NUMBA_AVAILABLE:
+    from numba import njit
+
+# OpenCV is optional here: used for faster resizing when installed
+CV2_AVAILABLE = importlib.util.find_spec("cv2") is not None
+
+if CV2_AVAILABLE:
+    import cv2
 
 # Shape mappings
 SHAPE_MAP = {
@@ -30,22 +48,191 @@ COLORS = ['red', 'blue', 'green', 'yellow', 'orange']
 POSITIONS = ['top', 'bottom', 'left', 'right', 'center', 'top-left', 'top-right', 
              'bottom-left', 'bottom-right']
 
+# Tokenizes an element string into optional color, shape and position parts in one match,
+# e.g. 'red', '○', 'top-left', 'red○', 'red-top', '□left'
+_ELEMENT_RE = re.compile(
+    r'^(?:(?P<color>{})(?:-(?=.))?)?(?P<shape>{})?(?P<position>{})?$'.format(
+        '|'.join(map(re.escape, COLORS)),
+        '|'.join(map(re.escape, SHAPE_MAP)),
+        # Longest first so 'top-left' wins over 'top'
+        '|'.join(map(re.escape, sorted(POSITIONS, key=len, reverse=True))),
+    )
+)
+
+# Element kind rendered by each task type (see src/config.py)
+TASK_TYPE_ELEMENT_KINDS = {
+    1: 'number',    # Arithmetic
+    2: 'number',    # Geometric
+    3: 'number',    # Power
+    4: 'number',    # Fibonacci
+    5: 'shape',     # Shape cycle
+    6: 'color',     # Color cycle
+    7: 'position',  # Direction cycle
+    8: 'mixed',     # Mixed (color+shape)
+}
+
+# Element kind of each plain (non-combined) string element
+_TOKEN_KINDS = {
+    **{shape: 'shape' for shape in SHAPE_MAP},
+    **{color: 'color' for color in COLORS},
+    **{position: 'position' for position in POSITIONS},
+}
+
+
+def _unit_regular_polygon(num_vertices: int) -> np.ndarray:
+    """Unit-radius regular polygon with one vertex pointing up (as RegularPolygon)."""
+    theta = np.pi / 2 + 2 * np.pi / num_vertices * np.arange(num_vertices)
+    return np.column_stack([np.cos(theta), np.sin(theta)])
+
+
+# Unit vertices per polygonal shape, scaled by a per-shape radius and translated per element
+_UNIT_POLYGONS = {
+    'square': np.array([(-1.0, -1.0), (1.0, -1.0), (1.0, 1.0), (-1.0, 1.0)]),
+    'triangle': _unit_regular_polygon(3),
+    'diamond': np.array([(0.0, -1.0), (1.0, 0.0), (0.0, 1.0), (-1.0, 0.0)]),
+    'star': _unit_regular_polygon(5),
+}
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _place_polygons(xs: np.ndarray, ys: np.ndarray, radii: np.ndarray,
+                        unit: np.ndarray) -> np.ndarray:
+        """Scale and translate unit vertices into an (N, K, 2) vertex array."""
+        out = np.empty((xs.size, unit.shape[0], 2))
+        for i in range(xs.size):
+            for k in range(unit.shape[0]):
+                out[i, k, 0] = xs[i] + radii[i] * unit[k, 0]
+                out[i, k, 1] = ys[i] + radii[i] * unit[k, 1]
+        return out
+else:
+    def _place_polygons(xs: np.ndarray, ys: np.ndarray, radii: np.ndarray,
+                        unit: np.ndarray) -> np.ndarray:
+        """Scale and translate unit vertices into an (N, K, 2) vertex array."""
+        return unit[None] * radii[:, None, None] + np.column_stack([xs, ys])[:, None, :]
+
+
+def _group_by_shape_type(shapes: List[Tuple]) -> dict:
+    """Group (shape_type, x, y, radius, facecolor) entries into per-type (xs, ys, radii, facecolors)."""
+    by_type = {}
+    for shape_type, x, y, radius, facecolor in shapes:
+        by_type.setdefault(shape_type, []).append((x, y, radius, facecolor))
+    
+    grouped = {}
+    for shape_type, entries in by_type.items():
+        xs, ys, radii, facecolors = zip(*entries)
+        grouped[shape_type] = (np.array(xs, dtype=float), np.array(ys, dtype=float),
+                               np.array(radii, dtype=float), list(facecolors))
+    return grouped
+
+
+def _polygon_vertices(polygons: List[Tuple]) -> Tuple[List[np.ndarray], List[str]]:
+    """Compute vertices for (shape_type, x, y, radius, facecolor) entries, one batch per shape type."""
+    vertices, facecolors = [], []
+    for shape_type, (xs, ys, radii, faces) in _group_by_shape_type(polygons).items():
+        vertices.extend(_place_polygons(xs, ys, radii, _UNIT_POLYGONS[shape_type]))
+        facecolors.extend(faces)
+    return vertices, facecolors
+
+
+# Unit paths per shape type, drawn with per-element size and offset by a PathCollection
+_UNIT_PATHS = {
+    'circle': Path.unit_circle(),
+    **{shape_type: Path(np.vstack([unit, unit[:1]]), closed=True)
+       for shape_type, unit in _UNIT_POLYGONS.items()},
+}
+
+
+# Shape radius (circumradius for polygons, half side for squares) as a fraction of
+# the shape's bounding box size
+_INV_SQRT3 = 1.0 / sqrt(3)
+_SHAPE_RADIUS_FACTORS = {
+    'circle': 0.5,
+    'square': 0.85 / 2,
+    'triangle': _INV_SQRT3,
+    'diamond': 0.5,
+    'star': 1 / 2.2,
+}
+
+# Arrow (start, end) offsets per position, in units of the arrow size
+_DIAGONAL_OFFSET = 0.35
+_STRAIGHT_OFFSET = 0.5
+_CENTER_OFFSET = 0.2
+_POSITION_ARROWS = {
+    'top-left': (((_DIAGONAL_OFFSET, _DIAGONAL_OFFSET), (-_DIAGONAL_OFFSET, -_DIAGONAL_OFFSET)),),
+    'top-right': (((-_DIAGONAL_OFFSET, _DIAGONAL_OFFSET), (_DIAGONAL_OFFSET, -_DIAGONAL_OFFSET)),),
+    'bottom-left': (((_DIAGONAL_OFFSET, -_DIAGONAL_OFFSET), (-_DIAGONAL_OFFSET, _DIAGONAL_OFFSET)),),
+    'bottom-right': (((-_DIAGONAL_OFFSET, -_DIAGONAL_OFFSET), (_DIAGONAL_OFFSET, _DIAGONAL_OFFSET)),),
+    'top': (((0.0, _STRAIGHT_OFFSET), (0.0, -_STRAIGHT_OFFSET)),),
+    'bottom': (((0.0, -_STRAIGHT_OFFSET), (0.0, _STRAIGHT_OFFSET)),),
+    'left': (((_STRAIGHT_OFFSET, 0.0), (-_STRAIGHT_OFFSET, 0.0)),),
+    'right': (((-_STRAIGHT_OFFSET, 0.0), (_STRAIGHT_OFFSET, 0.0)),),
+    # Four short arrows crossing at the center
+    'center': tuple(((dx, dy), (-dx, -dy)) for dx, dy in
+                    [(0.0, _CENTER_OFFSET), (0.0, -_CENTER_OFFSET),
+                     (_CENTER_OFFSET, 0.0), (-_CENTER_OFFSET, 0.0)]),
+}
+
+# Arrow geometry matching FancyArrowPatch(arrowstyle='->'): head length and width are
+# fractions of the mutation scale, ends are shrunk by 2 points
+_ARROW_HEAD_LENGTH = 0.4
+_ARROW_HEAD_WIDTH = 0.2
+_ARROW_HEAD_DIST = float(np.hypot(_ARROW_HEAD_LENGTH, _ARROW_HEAD_WIDTH))
+_ARROW_HEAD_COS = _ARROW_HEAD_LENGTH / _ARROW_HEAD_DIST
+_ARROW_HEAD_SIN = _ARROW_HEAD_WIDTH / _ARROW_HEAD_DIST
+_ARROW_SHRINK = 2.0
+
+# Supersampling factor for the Pillow fast path (Pillow does not antialias shapes)
+_PILLOW_SUPERSAMPLE = 2
+
+# Entries kept in each renderer's cache of empty and single-element renders
+_DEGENERATE_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=None)
+def _to_pil_color(color: str) -> str:
+    """Convert a Matplotlib color name to a hex string Pillow understands."""
+    return to_hex(color)
+
+
+class _PrimitiveBatch:
+    """Drawing primitives collected from a sequence, drawn in one pass."""
+    
+    def __init__(self):
+        self.circles = []   # (x, y, radius, facecolor)
+        self.polygons = []  # (shape_type, x, y, radius, facecolor)
+        self.arrows = []    # (start, end, head_scale, linewidth)
+        self.texts = []     # (x, y, text, fontsize)
+
 
 class SequenceRenderer:
     """Renderer for different types of sequence elements."""
     
-    def __init__(self, figsize=(10, 10), dpi=150, output_size=(1024, 1024)):
+    # Element renderer method per element kind; only 'mixed' goes through the
+    # generic per-element type detection of _render_element. Stored by name so
+    # instances hold no bound methods of themselves (no reference cycle)
+    _RENDER_IMPLS = {
+        'number': '_render_number',
+        'shape': '_render_shape',
+        'color': '_render_color',
+        'position': '_render_position',
+        'mixed': '_render_element',
+    }
+    
+    def __init__(self, figsize=(10, 10), dpi=150, output_size=(1024, 1024), pillow_fast_path=True):
         """
         Initialize sequence renderer.
         
         Args:
             figsize: Figure size in inches
-            dpi: Dots per inch
+            dpi: Dots per inch (ignored when output_size is given)
             output_size: Target output image size in pixels (width, height)
+            pillow_fast_path: Draw sequences without text (shapes, colors, positions)
+                directly with Pillow instead of Matplotlib
         """
         self.figsize = figsize
-        self.dpi = dpi
         self.output_size = output_size
+        # Render directly at the target resolution instead of resizing afterwards
+        self.dpi = output_size[0] / figsize[0] if output_size else dpi
         self.canvas_size = 10  # Coordinate system: 0 to 10
         self.blank_cell_width = 1.2
         self.blank_cell_height = 1.2
@@ -53,9 +240,30 @@ class SequenceRenderer:
         self.color_circle_size = 0.55
         self.number_fontsize = 50
         self.text_fontsize = 32
+        self.pillow_fast_path = pillow_fast_path
+        self._current_scale = 1.0
+        
+        # Reusable figure: cleared between renders instead of recreated. Built with the
+        # OO API so it is never registered with pyplot's global figure manager.
+        self._fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        self._canvas = FigureCanvasAgg(self._fig)
+        self._ax = self._fig.add_subplot(111)
+        self._fig.subplots_adjust(left=0, right=1, bottom=0, top=1)
+        self._ax.set_xlim(0, self.canvas_size)
+        self._ax.set_ylim(0, self.canvas_size)
+        self._ax.axis('off')
+        
+        # Per-character widths (canvas units) at number_fontsize, filled lazily
+        self._char_widths = {}
+        
+        # Renders of empty and single-element sequences, keyed on (type, element) pairs
+        # so equal values of different types (1 and 1.0) stay apart, plus every render
+        # argument including pillow_fast_path. Oldest entries are evicted first.
+        self._degenerate_renders = {}
     
     def render_sequence(self, sequence: List[Any], show_blank: bool = False,
-                       output_path: Optional[str] = None) -> Image.Image:
+                       output_path: Optional[str] = None, task_type: Optional[int] = None,
+                       element_kind: Optional[str] = None) -> Image.Image:
         """
         Render a sequence of elements. Returns PIL Image.
         
@@ -63,11 +271,143 @@ class SequenceRenderer:
             sequence: List of sequence elements (numbers, shapes, colors, positions, or mixed)
             show_blank: If True, show question mark for the last element (for first_frame)
             output_path: Optional path to save the image
+            task_type: Optional task type (1-8, see src/config.py), used to look up
+                element_kind when that is not given
+            element_kind: Kind shared by all elements: 'number', 'shape', 'color',
+                'position' or 'mixed'. Detected in one pass over the sequence if neither
+                this nor task_type is given.
         
         Returns:
             PIL Image of the rendered sequence
         """
+        if len(sequence) <= 1:
+            img = self._render_degenerate(sequence, show_blank, task_type, element_kind)
+        else:
+            img = self._render_image(sequence, show_blank, task_type, element_kind)
+        
+        # Save if path provided
+        if output_path:
+            img.save(output_path)
+        
+        return img
+    
+    def _render_degenerate(self, sequence: List[Any], show_blank: bool, task_type: Optional[int],
+                           element_kind: Optional[str]) -> Image.Image:
+        """Render an empty or single-element sequence through the per-instance cache."""
+        # With show_blank only the "?" is drawn, whatever the element
+        elements = [None] if show_blank and sequence else sequence
+        key = (tuple((type(element), element) for element in elements),
+               show_blank, task_type, element_kind, self.pillow_fast_path)
+        try:
+            img = self._degenerate_renders.get(key)
+        except TypeError:
+            # Unhashable element (e.g. a [color, shape] list): render uncached
+            return self._render_image(sequence, show_blank, task_type, element_kind)
+        
+        if img is None:
+            img = self._render_image(sequence, show_blank, task_type, element_kind)
+            if len(self._degenerate_renders) >= _DEGENERATE_CACHE_SIZE:
+                del self._degenerate_renders[next(iter(self._degenerate_renders))]
+            self._degenerate_renders[key] = img
+        # Hand out a copy so callers cannot mutate the cached image
+        return img.copy()
+    
+    def _render_image(self, sequence: List[Any], show_blank: bool, task_type: Optional[int],
+                      element_kind: Optional[str]) -> Image.Image:
+        """Render a sequence to a new PIL Image (see render_sequence)."""
         num_elements = len(sequence)
+        if num_elements == 0:
+            return Image.new('RGB', tuple(self.output_size) if self.output_size else
+                             self._canvas.get_width_height(), 'white')
+        
+        render_element, x_positions = self._layout(sequence, task_type, element_kind)
+        center_y = self.canvas_size / 2
+        scale = self._current_scale
+        
+        # Collect primitives for all elements, then draw them in batches
+        batch = _PrimitiveBatch()
+        for i, element in enumerate(sequence):
+            x = x_positions[i]
+            y = center_y
+            
+            if i == len(sequence) - 1 and show_blank:
+                # Show question mark
+                batch.texts.append((x, y, '?', int(self.number_fontsize * scale)))
+            elif element is not None:
+                # Render the element
+                render_element(batch, element, x, y, scale)
+        
+        if self.pillow_fast_path and not batch.texts:
+            # Only shapes and lines: no need for Matplotlib
+            img = self._draw_batch_pillow(batch)
+        else:
+            # Reset the shared axes: drop the previous render's artists only, since
+            # limits and axis state are fixed (ax.clear() would rebuild the axes)
+            ax = self._ax
+            for artist in [*ax.collections, *ax.texts]:
+                artist.remove()
+            self._draw_batch(ax, batch)
+            
+            # Convert to PIL Image straight from the Agg buffer (no PNG round-trip).
+            # frombuffer wraps the canvas memory without copying; convert() makes
+            # the only copy, so the image stays valid after the next draw.
+            self._canvas.draw()
+            img = Image.frombuffer('RGBA', self._canvas.get_width_height(), self._canvas.buffer_rgba(),
+                                   'raw', 'RGBA', 0, 1).convert('RGB')
+        
+        return self._fit_output(img)
+    
+    def render_sequence_pair(self, sequence: List[Any], task_type: Optional[int] = None,
+                             element_kind: Optional[str] = None) -> Tuple[Image.Image, Image.Image]:
+        """
+        Render the first frame (last element shown as "?") and final frame of a sequence.
+        
+        Both frames go through render_sequence, so they match its output exactly.
+        
+        Args:
+            sequence: Complete sequence, answer last
+            task_type: Optional task type, as for render_sequence
+            element_kind: Optional element kind, as for render_sequence
+        
+        Returns:
+            (first_frame, final_frame) PIL Images
+        """
+        first_frame = self.render_sequence([*sequence[:-1], None], show_blank=True,
+                                           task_type=task_type, element_kind=element_kind)
+        final_frame = self.render_sequence(sequence, task_type=task_type, element_kind=element_kind)
+        return first_frame, final_frame
+    
+    def _fit_output(self, img: Image.Image) -> Image.Image:
+        """Resize to output_size, only if the canvas size differs from it."""
+        if self.output_size and img.size != tuple(self.output_size):
+            img = self._resize(img, tuple(self.output_size))
+        return img
+    
+    def _layout(self, sequence: List[Any], task_type: Optional[int],
+                element_kind: Optional[str]) -> Tuple[Callable, List[float]]:
+        """
+        Classify a non-empty sequence and lay it out on the canvas.
+        
+        Sets _current_scale as a side effect.
+        
+        Returns:
+            (element renderer, element x positions)
+        """
+        num_elements = len(sequence)
+        
+        # Classify elements once: decides both the layout and the element renderer
+        if element_kind is None:
+            element_kind = TASK_TYPE_ELEMENT_KINDS.get(task_type)
+        if element_kind is None:
+            element_kind, has_numbers = self._classify_elements(sequence)
+        elif element_kind == 'mixed':
+            has_numbers = any(isinstance(elem, (int, float)) for elem in sequence if elem is not None)
+        else:
+            has_numbers = element_kind == 'number'
+        render_impl = self._RENDER_IMPLS.get(element_kind)
+        if render_impl is None:
+            raise ValueError(f"Unknown element kind: {element_kind}")
+        render_element = getattr(self, render_impl)
         
         # Calculate spacing and positioning
         safe_margin = 0.8
@@ -102,326 +442,268 @@ class SequenceRenderer:
         max_element_radius = max_element_radius_base * element_size_scale
         self._current_scale = element_size_scale
         
-        # Check if sequence contains numbers
-        has_numbers = any(isinstance(elem, (int, float)) for elem in sequence if elem is not None)
-        
         if has_numbers:
             # Edge-based spacing for numbers
             scale = element_size_scale
             fontsize = int(self.number_fontsize * scale)
             
-            # Measure text widths
-            temp_fig, temp_ax = plt.subplots(figsize=(1, 1))
-            temp_ax.axis('off')
-            
-            number_widths = []
-            for element in sequence:
-                if element is None:
-                    text_obj = temp_ax.text(0, 0, '?', fontsize=fontsize, ha='center', va='center',
-                                           fontweight='bold')
-                    bbox = text_obj.get_window_extent(renderer=temp_fig.canvas.get_renderer())
-                    width = bbox.width / temp_fig.dpi * (self.canvas_size / self.figsize[0])
-                    number_widths.append(width)
-                    text_obj.remove()
-                else:
-                    text_obj = temp_ax.text(0, 0, str(element), fontsize=fontsize, ha='center', va='center',
-                                           fontweight='bold')
-                    bbox = text_obj.get_window_extent(renderer=temp_fig.canvas.get_renderer())
-                    width = bbox.width / temp_fig.dpi * (self.canvas_size / self.figsize[0])
-                    number_widths.append(width)
-                    text_obj.remove()
-            
-            plt.close(temp_fig)
+            # Text width scales linearly with font size for a fixed font
+            width_scale = fontsize / self.number_fontsize
+            number_widths = width_scale * np.array([
+                self._measure_number_text('?' if element is None else str(element))
+                for element in sequence
+            ])
             
             gap_between_numbers = element_spacing * 0.5
             
-            x_positions = []
-            current_x = safe_margin
+            # Consecutive centers are spaced by the next number's width plus the gap,
+            # measured from the first number's left edge
+            steps = number_widths[1:] + gap_between_numbers
+            x_positions = number_widths[0] / 2 + np.concatenate([[0.0], np.cumsum(steps)])
+            total_number_width = x_positions[-1] + number_widths[-1] / 2
             
-            for i in range(len(number_widths)):
-                x_positions.append(current_x + number_widths[i] / 2)
-                if i < len(number_widths) - 1:
-                    current_x += number_widths[i] / 2 + gap_between_numbers + number_widths[i + 1] / 2
+            # Shrink numbers that would overflow the fixed canvas
+            if total_number_width > available_width:
+                fit = available_width / total_number_width
+                x_positions *= fit
+                total_number_width = available_width
+                self._current_scale = element_size_scale * fit
             
             # Center the sequence
-            first_number_left_edge = x_positions[0] - number_widths[0] / 2
-            last_number_right_edge = x_positions[-1] + number_widths[-1] / 2
-            actual_total_width = last_number_right_edge - first_number_left_edge
-            actual_sequence_center = first_number_left_edge + actual_total_width / 2
-            canvas_center = self.canvas_size / 2
-            offset = canvas_center - actual_sequence_center
-            x_positions = [x + offset for x in x_positions]
+            x_positions += (self.canvas_size - total_number_width) / 2
         else:
-            # Center-based spacing for non-numbers
-            total_width = (num_elements - 1) * element_spacing + max_element_radius * 2
-            temp_start_x = max_element_radius
-            first_element_left = temp_start_x - max_element_radius
-            last_element_right = temp_start_x + (num_elements - 1) * element_spacing + max_element_radius
-            actual_total_width = last_element_right - first_element_left
-            actual_sequence_center = first_element_left + actual_total_width / 2
-            canvas_center = self.canvas_size / 2
-            center_offset = canvas_center - actual_sequence_center
-            start_x = temp_start_x + center_offset
-            x_positions = [start_x + i * element_spacing for i in range(num_elements)]
+            # Center-based spacing for non-numbers, centered on the canvas
+            start_x = (self.canvas_size - (num_elements - 1) * element_spacing) / 2
+            x_positions = start_x + np.arange(num_elements) * element_spacing
             
             # Ensure margins
             first_pos_left = x_positions[0] - max_element_radius
             last_pos_right = x_positions[-1] + max_element_radius
             if first_pos_left < safe_margin:
-                shift = safe_margin - first_pos_left
-                x_positions = [x + shift for x in x_positions]
+                x_positions += safe_margin - first_pos_left
             elif last_pos_right > self.canvas_size - safe_margin:
-                shift = (self.canvas_size - safe_margin) - last_pos_right
-                x_positions = [x + shift for x in x_positions]
-        
-        center_y = self.canvas_size / 2
+                x_positions += (self.canvas_size - safe_margin) - last_pos_right
         
-        # Create figure
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
-        ax.set_xlim(0, self.canvas_size)
-        ax.set_ylim(0, self.canvas_size)
-        ax.axis('off')
+        x_positions = x_positions.tolist()
+        return render_element, x_positions
+    
+    @staticmethod
+    def _resize(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        """Resize with OpenCV when available (INTER_AREA for downscaling), else PIL LANCZOS."""
+        if not CV2_AVAILABLE:
+            return img.resize(size, Image.Resampling.LANCZOS)
         
-        # Render elements
-        for i, element in enumerate(sequence):
-            x = x_positions[i]
-            y = center_y
-            
-            if i == len(sequence) - 1 and show_blank:
-                # Show question mark
-                scale = getattr(self, '_current_scale', 1.0)
-                question_fontsize = int(self.number_fontsize * scale)
-                ax.text(x, y, '?', fontsize=question_fontsize, ha='center', va='center',
-                       fontweight='bold', color='black')
+        shrinking = size[0] <= img.width and size[1] <= img.height
+        interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_CUBIC
+        return Image.fromarray(cv2.resize(np.asarray(img), size, interpolation=interpolation))
+    
+    @staticmethod
+    def _classify_elements(sequence: List[Any]) -> Tuple[str, bool]:
+        """Return the kind shared by all elements ('mixed' otherwise) and whether any is a number."""
+        kinds = set()
+        for element in sequence:
+            if element is None:
+                continue
+            if isinstance(element, (int, float)):
+                kinds.add('number')
+            elif isinstance(element, str) and element in _TOKEN_KINDS:
+                kinds.add(_TOKEN_KINDS[element])
             else:
-                # Render the element
-                self._render_element(ax, element, x, y)
+                kinds.add('mixed')
+        kind = next(iter(kinds)) if len(kinds) == 1 else 'mixed'
+        return kind, 'number' in kinds
+    
+    def _measure_number_text(self, text: str) -> float:
+        """Width of bold number text at number_fontsize, in canvas units."""
+        if not self._char_widths:
+            self._measure_chars('0123456789-.?')
+        missing = [c for c in text if c not in self._char_widths]
+        if missing:
+            self._measure_chars(missing)
+        return sum(self._char_widths[c] for c in text)
+    
+    def _measure_chars(self, chars) -> None:
+        """Measure glyph widths once and cache them in _char_widths."""
+        renderer = self._canvas.get_renderer()
+        units_per_pixel = self.canvas_size / (self.figsize[0] * self._fig.dpi)
+        for char in chars:
+            text_obj = self._ax.text(0, 0, char, fontsize=self.number_fontsize, ha='center',
+                                     va='center', fontweight='bold')
+            bbox = text_obj.get_window_extent(renderer=renderer)
+            self._char_widths[char] = bbox.width * units_per_pixel
+            text_obj.remove()
+    
+    def _draw_batch(self, ax, batch: _PrimitiveBatch) -> None:
+        """Draw collected primitives with one collection per primitive type."""
+        # One PathCollection per shape type; sizes are (radius in points)^2
+        points_per_unit = 72.0 * self.figsize[0] / self.canvas_size
+        circles = [('circle', x, y, radius, facecolor) for x, y, radius, facecolor in batch.circles]
+        for shape_type, (xs, ys, radii, facecolors) in _group_by_shape_type(circles + batch.polygons).items():
+            shapes = PathCollection([_UNIT_PATHS[shape_type]], sizes=(radii * points_per_unit) ** 2,
+                                    offsets=np.column_stack([xs, ys]), offset_transform=ax.transData,
+                                    transform=IdentityTransform(), facecolors=facecolors,
+                                    edgecolors='black', linewidths=2)
+            ax.add_collection(shapes, autolim=False)
         
-        plt.tight_layout(pad=0)
+        if batch.arrows:
+            segments, linewidths = self._arrow_segments(batch.arrows)
+            arrows = LineCollection(segments, colors='black', linewidths=linewidths,
+                                    joinstyle='round', capstyle='round')
+            ax.add_collection(arrows, autolim=False)
         
-        # Convert to PIL Image
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight', dpi=self.dpi, pad_inches=0)
-        buf.seek(0)
-        img = Image.open(buf).convert('RGB')
-        plt.close()
+        for x, y, text, fontsize in batch.texts:
+            ax.text(x, y, text, fontsize=fontsize, ha='center', va='center',
+                   fontweight='bold', color='black')
+    
+    def _draw_batch_pillow(self, batch: _PrimitiveBatch) -> Image.Image:
+        """
+        Rasterize a text-free batch directly with PIL.ImageDraw, bypassing Matplotlib.
         
-        # Resize to exact output size if specified
-        if self.output_size:
-            img = img.resize(self.output_size, Image.Resampling.LANCZOS)
+        Drawn at _PILLOW_SUPERSAMPLE times the canvas resolution and box-reduced,
+        which stands in for Agg's antialiasing.
+        """
+        supersample = _PILLOW_SUPERSAMPLE
+        width, height = self._canvas.get_width_height()
+        img = Image.new('RGB', (width * supersample, height * supersample), 'white')
+        draw = ImageDraw.Draw(img)
         
-        # Save if path provided
-        if output_path:
-            img.save(output_path)
+        px_x = width * supersample / self.canvas_size
+        px_y = height * supersample / self.canvas_size
+        px_per_point = self._fig.dpi * supersample / 72.0
+        edge_width = max(1, round(2 * px_per_point))
         
-        return img
+        def to_px(points) -> List[Tuple[float, float]]:
+            return [(px * px_x, (self.canvas_size - py) * px_y) for px, py in points]
+        
+        for x, y, radius, facecolor in batch.circles:
+            cx, cy = x * px_x, (self.canvas_size - y) * px_y
+            # Matplotlib centers the edge on the outline; PIL draws it inside the box
+            rx = radius * px_x + edge_width / 2
+            ry = radius * px_y + edge_width / 2
+            draw.ellipse([cx - rx, cy - ry, cx + rx, cy + ry], fill=_to_pil_color(facecolor),
+                         outline='black', width=edge_width)
+        
+        for vertices, facecolor in zip(*_polygon_vertices(batch.polygons)):
+            points = to_px(vertices)
+            draw.polygon(points, fill=_to_pil_color(facecolor))
+            draw.line(points + points[:1], fill='black', width=edge_width, joint='curve')
+        
+        if batch.arrows:
+            segments, linewidths = self._arrow_segments(batch.arrows)
+            for segment, linewidth in zip(segments, linewidths):
+                points = to_px(segment)
+                line_width = max(1, round(linewidth * px_per_point))
+                draw.line(points, fill='black', width=line_width, joint='curve')
+                # Round caps
+                cap = line_width / 2
+                for ex, ey in (points[0], points[-1]):
+                    draw.ellipse([ex - cap, ey - cap, ex + cap, ey + cap], fill='black')
+        
+        return img.reduce(supersample) if supersample > 1 else img
     
-    def _render_element(self, ax, element: Any, x: float, y: float) -> None:
+    def _arrow_segments(self, arrows: List[Tuple]) -> Tuple[List[np.ndarray], np.ndarray]:
+        """
+        Compute line segments and widths (points) for the shafts and open heads of all arrows.
+        
+        Reproduces FancyArrowPatch(arrowstyle='->') geometry: both ends shrunk by
+        _ARROW_SHRINK points and the shaft pulled back so the head's stroke does
+        not overshoot the tip.
+        """
+        starts, ends, head_scales, linewidths = (np.asarray(a, dtype=float) for a in zip(*arrows))
+        points_per_unit = 72.0 * self.figsize[0] / self.canvas_size
+        
+        direction = ends - starts
+        direction /= np.hypot(direction[:, 0], direction[:, 1])[:, None]
+        starts = starts + direction * (_ARROW_SHRINK / points_per_unit)
+        tip_offset = (_ARROW_SHRINK + 0.5 * linewidths / _ARROW_HEAD_SIN) / points_per_unit
+        tips = ends - direction * tip_offset[:, None]
+        
+        # Head strokes point back from the tip, rotated by +/- the head half-angle
+        back = -direction * (_ARROW_HEAD_DIST * head_scales / points_per_unit)[:, None]
+        bx, by = back[:, 0], back[:, 1]
+        side1 = np.column_stack([_ARROW_HEAD_COS * bx + _ARROW_HEAD_SIN * by,
+                                 -_ARROW_HEAD_SIN * bx + _ARROW_HEAD_COS * by])
+        side2 = np.column_stack([_ARROW_HEAD_COS * bx - _ARROW_HEAD_SIN * by,
+                                 _ARROW_HEAD_SIN * bx + _ARROW_HEAD_COS * by])
+        
+        shafts = np.stack([starts, tips], axis=1)
+        heads = np.stack([tips + side1, tips, tips + side2], axis=1)
+        return list(shafts) + list(heads), np.concatenate([linewidths, linewidths])
+    
+    def _render_element(self, batch: _PrimitiveBatch, element: Any, x: float, y: float,
+                        scale: float) -> None:
         """Render a single element based on its type."""
         if element is None:
             return
         
         if isinstance(element, (int, float)):
-            # Number
-            scale = getattr(self, '_current_scale', 1.0)
-            ax.text(x, y, str(element), fontsize=int(self.number_fontsize * scale),
-                   ha='center', va='center', fontweight='bold', color='black')
+            self._render_number(batch, element, x, y, scale)
         
         elif isinstance(element, str):
-            if element in SHAPE_MAP:
-                self._render_shape(ax, element, x, y)
-            elif element in COLORS:
-                self._render_color(ax, element, x, y)
-            elif element in POSITIONS:
-                self._render_position(ax, element, x, y)
-            elif '+' in element or any(shape in element for shape in SHAPE_MAP.keys()):
-                self._render_mixed(ax, element, x, y)
-            elif '-' in element and any(color in element for color in COLORS):
-                self._render_mixed(ax, element, x, y)
-            else:
-                scale = getattr(self, '_current_scale', 1.0)
-                ax.text(x, y, element, fontsize=int(self.text_fontsize * scale),
-                       ha='center', va='center', fontweight='bold', color='black')
+            self._render_mixed(batch, element, x, y, scale)
         
         elif isinstance(element, (list, tuple)):
             if len(element) == 2:
-                self._render_mixed(ax, f"{element[0]}{element[1]}", x, y)
+                color, shape = element
+                if _TOKEN_KINDS.get(color) == 'color' and _TOKEN_KINDS.get(shape) == 'shape':
+                    # (color, shape) pair: no string building or parsing needed
+                    self._render_shape(batch, shape, x, y, scale, facecolor=color)
+                else:
+                    self._render_mixed(batch, f"{color}{shape}", x, y, scale)
             else:
-                scale = getattr(self, '_current_scale', 1.0)
-                ax.text(x, y, str(element), fontsize=int(self.text_fontsize * scale),
-                       ha='center', va='center', fontweight='bold', color='black')
+                batch.texts.append((x, y, str(element), int(self.text_fontsize * scale)))
     
-    def _render_shape(self, ax, shape: str, x: float, y: float) -> None:
+    def _render_number(self, batch: _PrimitiveBatch, number: Any, x: float, y: float,
+                       scale: float) -> None:
+        """Render a number as bold text."""
+        batch.texts.append((x, y, str(number), int(self.number_fontsize * scale)))
+    
+    def _render_shape(self, batch: _PrimitiveBatch, shape: str, x: float, y: float,
+                      scale: float, facecolor: str = 'lightblue') -> None:
         """Render a shape."""
         shape_type = SHAPE_MAP[shape]
-        scale = getattr(self, '_current_scale', 1.0)
-        bbox_size = self.shape_size * 2 * scale
-        
+        radius = self.shape_size * 2 * scale * _SHAPE_RADIUS_FACTORS[shape_type]
         if shape_type == 'circle':
-            circle = Circle((x, y), bbox_size / 2, facecolor='lightblue', edgecolor='black', linewidth=2)
-            ax.add_patch(circle)
-        elif shape_type == 'square':
-            square_size = bbox_size * 0.85
-            square = Rectangle((x - square_size / 2, y - square_size / 2), square_size, square_size,
-                             facecolor='lightblue', edgecolor='black', linewidth=2)
-            ax.add_patch(square)
-        elif shape_type == 'triangle':
-            triangle_radius = bbox_size / np.sqrt(3)
-            triangle = RegularPolygon((x, y), 3, radius=triangle_radius,
-                                    facecolor='lightblue', edgecolor='black', linewidth=2)
-            ax.add_patch(triangle)
-        elif shape_type == 'diamond':
-            half_size = bbox_size / 2
-            diamond_points = [
-                (x, y - half_size),
-                (x + half_size, y),
-                (x, y + half_size),
-                (x - half_size, y),
-            ]
-            diamond = Polygon(diamond_points, closed=True, facecolor='lightblue',
-                            edgecolor='black', linewidth=2)
-            ax.add_patch(diamond)
-        elif shape_type == 'star':
-            star_radius = bbox_size / 2.2
-            star = RegularPolygon((x, y), 5, radius=star_radius,
-                               facecolor='lightblue', edgecolor='black', linewidth=2)
-            ax.add_patch(star)
+            batch.circles.append((x, y, radius, facecolor))
+        else:
+            batch.polygons.append((shape_type, x, y, radius, facecolor))
     
-    def _render_color(self, ax, color: str, x: float, y: float) -> None:
+    def _render_color(self, batch: _PrimitiveBatch, color: str, x: float, y: float,
+                      scale: float) -> None:
         """Render a color as a colored circle."""
-        scale = getattr(self, '_current_scale', 1.0)
-        circle = Circle((x, y), self.color_circle_size * scale, facecolor=color,
-                       edgecolor='black', linewidth=2)
-        ax.add_patch(circle)
+        batch.circles.append((x, y, self.color_circle_size * scale, color))
     
-    def _render_position(self, ax, position: str, x: float, y: float) -> None:
+    def _render_position(self, batch: _PrimitiveBatch, position: str, x: float, y: float,
+                         scale: float) -> None:
         """Render a position as an arrow."""
-        scale = getattr(self, '_current_scale', 1.0)
+        arrows = _POSITION_ARROWS.get(position)
+        if arrows is None:
+            return
+        
         arrow_size = self.shape_size * scale * 2.2
-        arrow_lw = 5 * scale
-        center_arrow_lw = 4 * scale
-        arrow_head_scale = 30 * scale
-        center_arrow_head_scale = 25 * scale
-        
-        if 'top' in position and 'left' in position:
-            arrow = FancyArrowPatch((x + arrow_size * 0.35, y + arrow_size * 0.35),
-                                   (x - arrow_size * 0.35, y - arrow_size * 0.35),
-                                   arrowstyle='->', mutation_scale=arrow_head_scale, lw=arrow_lw, color='black')
-            ax.add_patch(arrow)
-        elif 'top' in position and 'right' in position:
-            arrow = FancyArrowPatch((x - arrow_size * 0.35, y + arrow_size * 0.35),
-                                   (x + arrow_size * 0.35, y - arrow_size * 0.35),
-                                   arrowstyle='->', mutation_scale=arrow_head_scale, lw=arrow_lw, color='black')
-            ax.add_patch(arrow)
-        elif 'bottom' in position and 'left' in position:
-            arrow = FancyArrowPatch((x + arrow_size * 0.35, y - arrow_size * 0.35),
-                                   (x - arrow_size * 0.35, y + arrow_size * 0.35),
-                                   arrowstyle='->', mutation_scale=arrow_head_scale, lw=arrow_lw, color='black')
-            ax.add_patch(arrow)
-        elif 'bottom' in position and 'right' in position:
-            arrow = FancyArrowPatch((x - arrow_size * 0.35, y - arrow_size * 0.35),
-                                   (x + arrow_size * 0.35, y + arrow_size * 0.35),
-                                   arrowstyle='->', mutation_scale=arrow_head_scale, lw=arrow_lw, color='black')
-            ax.add_patch(arrow)
-        elif 'top' in position:
-            arrow = FancyArrowPatch((x, y + arrow_size * 0.5), (x, y - arrow_size * 0.5),
-                                   arrowstyle='->', mutation_scale=arrow_head_scale, lw=arrow_lw, color='black')
-            ax.add_patch(arrow)
-        elif 'bottom' in position:
-            arrow = FancyArrowPatch((x, y - arrow_size * 0.5), (x, y + arrow_size * 0.5),
-                                   arrowstyle='->', mutation_scale=arrow_head_scale, lw=arrow_lw, color='black')
-            ax.add_patch(arrow)
-        elif 'left' in position:
-            arrow = FancyArrowPatch((x + arrow_size * 0.5, y), (x - arrow_size * 0.5, y),
-                                   arrowstyle='->', mutation_scale=arrow_head_scale, lw=arrow_lw, color='black')
-            ax.add_patch(arrow)
-        elif 'right' in position:
-            arrow = FancyArrowPatch((x - arrow_size * 0.5, y), (x + arrow_size * 0.5, y),
-                                   arrowstyle='->', mutation_scale=arrow_head_scale, lw=arrow_lw, color='black')
-            ax.add_patch(arrow)
-        elif 'center' in position:
-            small_arrow = arrow_size * 0.4
-            for (dx, dy) in [(0, small_arrow * 0.5), (0, -small_arrow * 0.5),
-                            (small_arrow * 0.5, 0), (-small_arrow * 0.5, 0)]:
-                arrow = FancyArrowPatch((x + dx, y + dy), (x - dx, y - dy),
-                                       arrowstyle='->', mutation_scale=center_arrow_head_scale,
-                                       lw=center_arrow_lw, color='black')
-                ax.add_patch(arrow)
+        if position == 'center':
+            head_scale, arrow_lw = 25 * scale, 4 * scale
+        else:
+            head_scale, arrow_lw = 30 * scale, 5 * scale
+        
+        for (start_dx, start_dy), (end_dx, end_dy) in arrows:
+            batch.arrows.append(((x + start_dx * arrow_size, y + start_dy * arrow_size),
+                                 (x + end_dx * arrow_size, y + end_dy * arrow_size),
+                                 head_scale, arrow_lw))
     
-    def _render_mixed(self, ax, mixed: str, x: float, y: float) -> None:
-        """Render a mixed element (color+shape, color+position, shape+position)."""
-        scale = getattr(self, '_current_scale', 1.0)
-        shape_chars = ['○', '□', '△', '◇', 'star']
-        
-        # Check if it starts with a color
-        color_part = None
-        remaining = None
-        
-        for color in COLORS:
-            if mixed.startswith(color):
-                color_part = color
-                remaining = mixed[len(color):]
-                if remaining.startswith('-'):
-                    remaining = remaining[1:]
-                break
-        
-        if color_part:
-            color_en = color_part
-            
-            if remaining and remaining in SHAPE_MAP:
-                # Color + Shape
-                shape_type = SHAPE_MAP[remaining]
-                bbox_size = self.shape_size * 2 * scale
-                
-                if shape_type == 'circle':
-                    circle = Circle((x, y), bbox_size / 2, facecolor=color_en, edgecolor='black', linewidth=2)
-                    ax.add_patch(circle)
-                elif shape_type == 'square':
-                    square_size = bbox_size * 0.85
-                    square = Rectangle((x - square_size / 2, y - square_size / 2), square_size, square_size,
-                                     facecolor=color_en, edgecolor='black', linewidth=2)
-                    ax.add_patch(square)
-                elif shape_type == 'triangle':
-                    triangle_radius = bbox_size / np.sqrt(3)
-                    triangle = RegularPolygon((x, y), 3, radius=triangle_radius,
-                                            facecolor=color_en, edgecolor='black', linewidth=2)
-                    ax.add_patch(triangle)
-                elif shape_type == 'diamond':
-                    half_size = bbox_size / 2
-                    diamond_points = [
-                        (x, y - half_size),
-                        (x + half_size, y),
-                        (x, y + half_size),
-                        (x - half_size, y),
-                    ]
-                    diamond = Polygon(diamond_points, closed=True, facecolor=color_en,
-                                    edgecolor='black', linewidth=2)
-                    ax.add_patch(diamond)
-                elif shape_type == 'star':
-                    star_radius = bbox_size / 2.2
-                    star = RegularPolygon((x, y), 5, radius=star_radius,
-                                       facecolor=color_en, edgecolor='black', linewidth=2)
-                    ax.add_patch(star)
-                return
-            
-            elif remaining and (remaining in POSITIONS or any(p in remaining for p in POSITIONS)):
-                # Color + Position
-                circle = Circle((x, y), self.color_circle_size * scale, facecolor=color_en,
-                               edgecolor='black', linewidth=2)
-                ax.add_patch(circle)
-                self._render_position(ax, remaining, x, y)
-                return
-        
-        # Check if it's shape+position
-        for shape_char in shape_chars:
-            if mixed.startswith(shape_char):
-                position_part = mixed[len(shape_char):]
-                if position_part in POSITIONS or any(p in position_part for p in POSITIONS):
-                    self._render_shape(ax, shape_char, x, y)
-                    self._render_position(ax, position_part, x, y)
-                    return
-        
-        # Fallback: render as text
-        ax.text(x, y, mixed, fontsize=int(self.text_fontsize * scale),
-               ha='center', va='center', fontweight='bold', color='black')
-
+    def _render_mixed(self, batch: _PrimitiveBatch, mixed: str, x: float, y: float,
+                      scale: float) -> None:
+        """Render a shape, color, position or combination of them (e.g. color+shape)."""
+        match = _ELEMENT_RE.match(mixed)
+        if match is None or match.end() == 0:
+            # Fallback: render as text
+            batch.texts.append((x, y, mixed, int(self.text_fontsize * scale)))
+            return
+        
+        color, shape, position = match.group('color', 'shape', 'position')
+        if shape:
+            self._render_shape(batch, shape, x, y, scale, facecolor=color or 'lightblue')
+        elif color:
+            self._render_color(batch, color, x, y, scale)
+        if position:
+            self._render_position(batch, position, x, y, scale)
@@ -56,8 +56,16 @@ Examples:
         action="store_true",
         help="Disable video generation"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for generation (default: 1; 0 = CPU count)"
+    )
     
     args = parser.parse_args()
+    if args.workers < 0:
+        parser.error("--workers must be 0 (CPU count) or a positive number")
     
     print(f"🎲 Generating {args.num_samples} tasks...")
     
@@ -71,6 +79,7 @@ Examples:
         random_seed=args.seed,
         output_dir=Path(args.output),
         generate_videos=not args.no_videos,
+        num_workers=args.workers or None,
     )
     
     # Generate tasks
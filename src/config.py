@@ -7,6 +7,8 @@
 ╚══════════════════════════════════════════════════════════════════════════════╝
 """
 
+from typing import Optional
+
 from pydantic import Field
 from core import GenerationConfig
 
@@ -66,3 +68,13 @@ class TaskConfig(GenerationConfig):
         default=None,
         description="Maximum number of tasks to generate per type (None = all)"
     )
+    
+    # ══════════════════════════════════════════════════════════════════════════
+    #  PARALLELISM
+    # ══════════════════════════════════════════════════════════════════════════
+    
+    num_workers: Optional[int] = Field(
+        default=1,
+        ge=1,
+        description="Worker processes for generate_dataset (1 = serial, None = CPU count)"
+    )
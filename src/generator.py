@@ -9,11 +9,14 @@
 ╚══════════════════════════════════════════════════════════════════════════════╝
 """
 
+import os
 import random
 import tempfile
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
-from itertools import permutations
+from typing import List, Tuple, Dict, Any, Iterator, NamedTuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, permutations
+import numpy as np
 from PIL import Image
 
 from core import BaseGenerator, TaskPair
@@ -22,7 +25,6 @@ from core.sequence_renderer import SequenceRenderer, SHAPE_MAP, COLORS, POSITION
 from .config import TaskConfig
 from .prompts import get_prompt
 
-
 # Task type mappings
 TASK_TYPE_NAMES = {
     1: "arithmetic",
@@ -35,6 +37,83 @@ TASK_TYPE_NAMES = {
     8: "mixed"
 }
 
+class TaskDef(NamedTuple):
+    """
+    One task definition; parameter meaning depends on type_id.
+    
+    1 Arithmetic: start, step, length
+    2 Geometric: start, ratio, length
+    3 Power: base, power, length
+    4 Fibonacci: first, second, length
+    5-8 Cycles: cycle (tuple; (color, shape) pairs for 8), length, mixed type (8 only)
+    
+    prompt is filled in by _generate_all_task_definitions.
+    """
+    type_id: int
+    p0: Any
+    p1: Any
+    p2: Any = None
+    prompt: Optional[str] = None
+
+
+# Cycle vocabularies, frozen at import
+SHAPE_KEYS = tuple(SHAPE_MAP.keys())
+COLOR_TUPLE = tuple(COLORS)
+
+# Ordered k-element choices by cycle length, enumerated once
+_SHAPE_PERMUTATIONS = {k: tuple(permutations(SHAPE_KEYS, k)) for k in (3, 4, 5)}
+_COLOR_PERMUTATIONS = {k: tuple(permutations(COLOR_TUPLE, k)) for k in (3, 4)}
+
+# Canonical instance of direction and mixed cycles, which are rebuilt per task group;
+# shape and color cycles already share the tuples in the permutation tables
+CYCLE_POOL: Dict[Tuple, Tuple] = {}
+
+
+def _intern_cycle(cycle) -> Tuple:
+    """Return the pooled tuple equal to cycle, adding it on first use."""
+    cycle = tuple(cycle)
+    return CYCLE_POOL.setdefault(cycle, cycle)
+
+
+def _fibonacci_pair(first: int, second: int, length: int) -> Tuple[Tuple[int, ...], int]:
+    """Fibonacci sequence (without the answer) and answer, as a tuple and an int."""
+    a, b = first, second
+    values = [a, b]
+    for _ in range(length - 3):
+        a, b = b, a + b
+        values.append(b)
+    return tuple(values), values[-1] + values[-2]
+
+
+# Every Fibonacci task enumerated by _enumerate_fibonacci_tasks, computed once
+_FIB_CACHE = {
+    (first, second, length): _fibonacci_pair(first, second, length)
+    for first in range(1, 10) for second in range(1, 10) for length in (6, 7)
+}
+
+
+def _valid_combinations(valid: np.ndarray, *grids: np.ndarray) -> Iterator[Tuple[int, ...]]:
+    """Yield the broadcast grid values where valid is True, in nested-loop order."""
+    return zip(*(grid[valid].tolist() for grid in np.broadcast_arrays(*grids)))
+
+
+# Per-process generator used by TaskGenerator.generate_dataset workers
+_worker_generator = None
+
+
+def _init_worker(config: TaskConfig, all_tasks: List[TaskDef]) -> None:
+    """Create the generator reused by every task in this worker process."""
+    global _worker_generator
+    # BaseGenerator.__init__ re-seeds random/np.random identically in every worker.
+    # Harmless: workers get all_tasks and explicit task indices, so no randomness is
+    # drawn after enumeration
+    _worker_generator = TaskGenerator(config, all_tasks=all_tasks)
+
+
+def _generate_one(task_id: str, task_index: int) -> TaskPair:
+    """Generate one task pair in a worker."""
+    return _worker_generator.generate_task_pair(task_id, task_index=task_index)
+
 
 class TaskGenerator(BaseGenerator):
     """
@@ -51,7 +130,13 @@ class TaskGenerator(BaseGenerator):
     8. Mixed sequences (color+shape)
     """
     
-    def __init__(self, config: TaskConfig):
+    def __init__(self, config: TaskConfig, all_tasks: Optional[List[TaskDef]] = None):
+        """
+        Args:
+            config: Task configuration
+            all_tasks: Already enumerated task definitions (e.g. handed to worker
+                processes); enumerated from config when None
+        """
         super().__init__(config)
         self.sequence_renderer = SequenceRenderer(output_size=config.image_size)
         
@@ -59,64 +144,52 @@ class TaskGenerator(BaseGenerator):
         self.video_generator = None
         if config.generate_videos and VideoGenerator.is_available():
             self.video_generator = VideoGenerator(fps=config.video_fps, output_format="mp4")
+            self._video_temp_dir = Path(tempfile.gettempdir()) / f"{config.domain}_videos"
+            self._video_temp_dir.mkdir(parents=True, exist_ok=True)
         
-        # Pre-generate all task definitions
-        self.all_tasks = self._generate_all_task_definitions()
-        
-        # Filter by task types if specified
-        if config.task_types:
-            self.all_tasks = [t for t in self.all_tasks if t[1] in config.task_types]
-        
-        # Limit tasks per type if specified
-        if config.max_tasks_per_type:
-            task_by_type = {}
-            for task in self.all_tasks:
-                task_type = task[1]
-                if task_type not in task_by_type:
-                    task_by_type[task_type] = []
-                task_by_type[task_type].append(task)
-            
-            limited_tasks = []
-            for task_type, tasks in task_by_type.items():
-                limited_tasks.extend(tasks[:config.max_tasks_per_type])
-            self.all_tasks = limited_tasks
+        # Config values read for every task pair
+        self._gen_video = bool(config.generate_videos and self.video_generator)
+        self._domain = config.domain
         
-        # Shuffle for random sampling
-        random.shuffle(self.all_tasks)
-        
-        print(f"📊 Loaded {len(self.all_tasks)} sequence completion task definitions")
+        if all_tasks is not None:
+            self.all_tasks = all_tasks
+        else:
+            # Enumerate task definitions lazily per type, so types that are filtered out
+            # are never expanded and max_tasks_per_type stops each type early
+            self.all_tasks = list(self._generate_all_task_definitions(
+                config.task_types, config.max_tasks_per_type))
+            print(f"📊 Loaded {len(self.all_tasks)} sequence completion task definitions")
     
     def generate_task_pair(self, task_id: str, task_index: int = None) -> TaskPair:
         """Generate one task pair."""
-        # Use provided task_index or default to 0
+        # Use provided task_index or draw a random task (all_tasks is not shuffled)
         if task_index is None:
-            task_index = getattr(self, '_current_task_index', 0)
+            task_index = random.randrange(len(self.all_tasks))
         
         # Ensure we don't exceed available tasks
         if task_index >= len(self.all_tasks):
             task_index = task_index % len(self.all_tasks)
         
-        _, task_type, task_params = self.all_tasks[task_index]
+        task = self.all_tasks[task_index]
+        task_type = task.type_id
         
         # Generate sequence and answer
-        sequence, answer = self._generate_sequence(task_type, task_params)
+        sequence, answer = self._generate_sequence(task)
         
         # Render images
-        first_image = self._render_sequence_with_blank(sequence)
-        final_image = self._render_complete_sequence(sequence, answer)
+        first_image, final_image = self._render_task_images(sequence, answer, task_type)
         
         # Generate video (optional)
         video_path = None
-        if self.config.generate_videos and self.video_generator:
+        if self._gen_video:
             video_path = self._generate_video(first_image, final_image, task_id)
         
         # Get prompt based on task type
-        task_type_name = TASK_TYPE_NAMES.get(task_type, "default")
-        prompt = get_prompt(task_type_name)
+        prompt = task.prompt or get_prompt(TASK_TYPE_NAMES.get(task_type, "default"))
         
         return TaskPair(
             task_id=task_id,
-            domain=self.config.domain,
+            domain=self._domain,
             prompt=prompt,
             first_image=first_image,
             final_image=final_image,
@@ -124,40 +197,47 @@ class TaskGenerator(BaseGenerator):
         )
     
     def generate_dataset(self) -> List[TaskPair]:
-        """Generate complete dataset."""
-        pairs = []
+        """Generate complete dataset, in config.num_workers worker processes."""
         num_samples = min(self.config.num_samples, len(self.all_tasks))
         
-        for i in range(num_samples):
-            task_id = f"{self.config.domain}_{i:04d}"
-            pair = self.generate_task_pair(task_id, task_index=i)
-            pairs.append(pair)
-            task_type = self.all_tasks[i][1]
-            print(f"  Generated: {task_id} (Type {task_type}: {TASK_TYPE_NAMES.get(task_type, 'unknown')})")
+        # Sample task indices instead of shuffling the whole task list
+        task_indices = random.sample(range(len(self.all_tasks)), num_samples)
+        task_ids = [f"{self.config.domain}_{i:04d}" for i in range(num_samples)]
         
-        return pairs
+        num_workers = min(self.config.num_workers or os.cpu_count() or 1, max(num_samples, 1))
+        if num_workers == 1:
+            return self._collect_pairs(task_indices, map(self.generate_task_pair, task_ids, task_indices))
+        
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                                 initargs=(self.config, self.all_tasks)) as executor:
+            return self._collect_pairs(task_indices, executor.map(_generate_one, task_ids, task_indices))
+    
+    def _collect_pairs(self, task_indices: List[int], pairs: Iterator[TaskPair]) -> List[TaskPair]:
+        """Gather generated pairs in order, reporting each one."""
+        collected = []
+        for task_index, pair in zip(task_indices, pairs):
+            collected.append(pair)
+            task_type = self.all_tasks[task_index].type_id
+            print(f"  Generated: {pair.task_id} (Type {task_type}: {TASK_TYPE_NAMES.get(task_type, 'unknown')})")
+        return collected
     
     # ══════════════════════════════════════════════════════════════════════════
     #  SEQUENCE GENERATION METHODS
     # ══════════════════════════════════════════════════════════════════════════
     
-    def _generate_sequence(self, task_type: int, task_params: Dict[str, Any]) -> Tuple[List[Any], Any]:
+    def _generate_sequence(self, task: TaskDef) -> Tuple[List[Any], Any]:
         """Generate sequence and answer based on task type."""
+        task_type, p0, p1, p2 = task[:4]
         if task_type == 1:  # Arithmetic
-            return self._generate_arithmetic_sequence(
-                task_params['start'], task_params['step'], task_params['length'])
+            return self._generate_arithmetic_sequence(p0, p1, p2)
         elif task_type == 2:  # Geometric
-            return self._generate_geometric_sequence(
-                task_params['start'], task_params['ratio'], task_params['length'])
+            return self._generate_geometric_sequence(p0, p1, p2)
         elif task_type == 3:  # Power
-            return self._generate_power_sequence(
-                task_params['base'], task_params['power'], task_params['length'])
+            return self._generate_power_sequence(p0, p1, p2)
         elif task_type == 4:  # Fibonacci
-            return self._generate_fibonacci_sequence(
-                task_params['first'], task_params['second'], task_params['length'])
+            return self._generate_fibonacci_sequence(p0, p1, p2)
         elif task_type in [5, 6, 7, 8]:  # Cycles
-            return self._generate_cycle_sequence(
-                task_params['cycle'], task_params['length'])
+            return self._generate_cycle_sequence(p0, p1)
         else:
             raise ValueError(f"Unknown task type: {task_type}")
     
@@ -181,39 +261,28 @@ class TaskGenerator(BaseGenerator):
     
     def _generate_fibonacci_sequence(self, first: int, second: int, length: int) -> Tuple[List[int], int]:
         """Generate Fibonacci sequence and answer."""
-        sequence = [first, second]
-        for i in range(2, length - 1):
-            sequence.append(sequence[i-1] + sequence[i-2])
-        answer = sequence[-1] + sequence[-2]
-        return sequence, answer
+        sequence, answer = (_FIB_CACHE.get((first, second, length))
+                            or _fibonacci_pair(first, second, length))
+        return list(sequence), answer
     
-    def _generate_cycle_sequence(self, cycle: List[Any], length: int) -> Tuple[List[Any], Any]:
+    def _generate_cycle_sequence(self, cycle: Tuple[Any, ...], length: int) -> Tuple[List[Any], Any]:
         """Generate cycle sequence and answer."""
-        sequence = []
-        for i in range(length - 1):
-            sequence.append(cycle[i % len(cycle)])
-        answer = cycle[(length - 1) % len(cycle)]
-        return sequence, answer
+        # Repeat the whole cycle enough times and slice, instead of indexing modulo per element
+        extended = list(cycle) * (length // len(cycle) + 1)
+        return extended[:length - 1], extended[length - 1]
     
     # ══════════════════════════════════════════════════════════════════════════
     #  RENDERING METHODS
     # ══════════════════════════════════════════════════════════════════════════
     
-    def _render_sequence_with_blank(self, sequence: List[Any]) -> Image.Image:
-        """Render sequence with blank (question mark) at the end."""
-        sequence_with_blank = sequence + [None]
-        return self.sequence_renderer.render_sequence(sequence_with_blank, show_blank=True)
-    
-    def _render_complete_sequence(self, sequence: List[Any], answer: Any) -> Image.Image:
-        """Render complete sequence with answer."""
-        complete_sequence = sequence + [answer]
-        return self.sequence_renderer.render_sequence(complete_sequence, show_blank=False)
+    def _render_task_images(self, sequence: List[Any], answer: Any,
+                            task_type: int) -> Tuple[Image.Image, Image.Image]:
+        """Render the first frame (answer shown as "?") and the final frame."""
+        return self.sequence_renderer.render_sequence_pair([*sequence, answer], task_type=task_type)
     
     def _generate_video(self, first_image: Image.Image, final_image: Image.Image, task_id: str) -> Optional[str]:
         """Generate ground truth video."""
-        temp_dir = Path(tempfile.gettempdir()) / f"{self.config.domain}_videos"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        video_path = temp_dir / f"{task_id}_ground_truth.mp4"
+        video_path = self._video_temp_dir / f"{task_id}_ground_truth.mp4"
         
         # Use crossfade video for smooth transition
         result = self.video_generator.create_crossfade_video(
@@ -227,78 +296,88 @@ class TaskGenerator(BaseGenerator):
     #  TASK DEFINITION GENERATION
     # ══════════════════════════════════════════════════════════════════════════
     
-    def _generate_all_task_definitions(self) -> List[Tuple[str, int, Dict[str, Any]]]:
-        """Generate all possible task definitions."""
-        all_tasks = []
+    def _generate_all_task_definitions(self, task_types: Optional[List[int]] = None,
+                                       max_tasks_per_type: Optional[int] = None
+                                       ) -> Iterator[TaskDef]:
+        """
+        Lazily yield task definitions, type by type.
         
-        # Type 1: Arithmetic Sequence
-        for start in range(1, 16):
-            for step in [-5, -2, -1, 1, 2, 5]:
-                for length in [5, 6, 7]:
-                    test_seq, test_ans = self._generate_arithmetic_sequence(start, step, length)
-                    if min(test_seq + [test_ans]) >= 0 or all(x >= 0 for x in test_seq):
-                        task_params = {'start': start, 'step': step, 'length': length}
-                        all_tasks.append(('arithmetic', 1, task_params))
+        Args:
+            task_types: Task types to enumerate (all if empty or None)
+            max_tasks_per_type: Maximum number of definitions per type (all if None)
         
-        # Type 2: Geometric Sequence
-        for start in range(1, 31):
-            for ratio in [2, 3, 4]:
-                for length in [5, 6, 7]:
-                    test_seq, test_ans = self._generate_geometric_sequence(start, ratio, length)
-                    if test_ans <= 1000:
-                        task_params = {'start': start, 'ratio': ratio, 'length': length}
-                        all_tasks.append(('geometric', 2, task_params))
-        
-        # Type 3: Power Sequence
-        for base in range(1, 11):
-            for length in [5, 6]:
-                test_seq, test_ans = self._generate_power_sequence(base, 2, length)
-                if test_ans <= 100:
-                    task_params = {'base': base, 'power': 2, 'length': length}
-                    all_tasks.append(('power', 3, task_params))
-        
-        # Type 4: Fibonacci Sequence
+        Yields:
+            TaskDef tuples with their prompt set
+        """
+        enumerators = {
+            1: self._enumerate_arithmetic_tasks,
+            2: self._enumerate_geometric_tasks,
+            3: self._enumerate_power_tasks,
+            4: self._enumerate_fibonacci_tasks,
+            5: self._enumerate_shape_cycle_tasks,
+            6: self._enumerate_color_cycle_tasks,
+            7: self._enumerate_direction_cycle_tasks,
+            8: self._enumerate_mixed_tasks,
+        }
+        for task_type, enumerate_tasks in enumerators.items():
+            if task_types and task_type not in task_types:
+                continue
+            # Prompt chosen once per task definition, at enumeration time
+            task_type_name = TASK_TYPE_NAMES[task_type]
+            for task in islice(enumerate_tasks(), max_tasks_per_type or None):
+                yield task._replace(prompt=get_prompt(task_type_name))
+    
+    def _enumerate_arithmetic_tasks(self) -> Iterator[TaskDef]:
+        """Type 1: Arithmetic Sequence."""
+        starts = np.arange(1, 16)[:, None, None]
+        steps = np.array([-5, -2, -1, 1, 2, 5])[None, :, None]
+        lengths = np.array([5, 6, 7])[None, None, :]
+        # Sequences are monotone, so the shown values are non-negative iff both ends are
+        last_shown = starts + (lengths - 2) * steps
+        valid = np.minimum(starts, last_shown) >= 0
+        for start, step, length in _valid_combinations(valid, starts, steps, lengths):
+            yield TaskDef(1, start, step, length)
+    
+    def _enumerate_geometric_tasks(self) -> Iterator[TaskDef]:
+        """Type 2: Geometric Sequence."""
+        starts = np.arange(1, 31)[:, None, None]
+        ratios = np.array([2, 3, 4])[None, :, None]
+        lengths = np.array([5, 6, 7])[None, None, :]
+        valid = starts * ratios ** (lengths - 1) <= 1000
+        for start, ratio, length in _valid_combinations(valid, starts, ratios, lengths):
+            yield TaskDef(2, start, ratio, length)
+    
+    def _enumerate_power_tasks(self) -> Iterator[TaskDef]:
+        """Type 3: Power Sequence."""
+        bases = np.arange(1, 11)[:, None]
+        lengths = np.array([5, 6])[None, :]
+        valid = (bases + lengths - 1) ** 2 <= 100
+        for base, length in _valid_combinations(valid, bases, lengths):
+            yield TaskDef(3, base, 2, length)
+    
+    def _enumerate_fibonacci_tasks(self) -> Iterator[TaskDef]:
+        """Type 4: Fibonacci Sequence."""
         for first in range(1, 10):
             for second in range(1, 10):
                 for length in [6, 7]:
-                    task_params = {'first': first, 'second': second, 'length': length}
-                    all_tasks.append(('fibonacci', 4, task_params))
-        
-        # Type 5: Shape Cycle
-        shapes = list(SHAPE_MAP.keys())
-        for cycle_len in [3, 4, 5]:
-            if cycle_len == 3:
-                for combo in permutations(shapes, 3):
-                    cycle = list(combo)
-                    for length in [5, 6, 7]:
-                        task_params = {'cycle': cycle, 'length': length}
-                        all_tasks.append(('shape_cycle', 5, task_params))
-            elif cycle_len == 4:
-                for combo in permutations(shapes, 4):
-                    cycle = list(combo)
-                    for length in [6, 7, 8]:
-                        task_params = {'cycle': cycle, 'length': length}
-                        all_tasks.append(('shape_cycle', 5, task_params))
-            elif cycle_len == 5:
-                for combo in permutations(shapes, 5):
-                    cycle = list(combo)
-                    for length in [7, 8]:
-                        task_params = {'cycle': cycle, 'length': length}
-                        all_tasks.append(('shape_cycle', 5, task_params))
-        
-        # Type 6: Color Cycle
-        for combo in permutations(COLORS, 3):
-            cycle = list(combo)
-            for length in [5, 6, 7, 8]:
-                task_params = {'cycle': cycle, 'length': length}
-                all_tasks.append(('color_cycle', 6, task_params))
-        for combo in permutations(COLORS, 4):
-            cycle = list(combo)
-            for length in [6, 7, 8]:
-                task_params = {'cycle': cycle, 'length': length}
-                all_tasks.append(('color_cycle', 6, task_params))
-        
-        # Type 7: Direction Cycle
+                    yield TaskDef(4, first, second, length)
+    
+    def _enumerate_shape_cycle_tasks(self) -> Iterator[TaskDef]:
+        """Type 5: Shape Cycle."""
+        for cycle_len, lengths in [(3, [5, 6, 7]), (4, [6, 7, 8]), (5, [7, 8])]:
+            for combo in _SHAPE_PERMUTATIONS[cycle_len]:
+                for length in lengths:
+                    yield TaskDef(5, combo, length)
+    
+    def _enumerate_color_cycle_tasks(self) -> Iterator[TaskDef]:
+        """Type 6: Color Cycle."""
+        for cycle_len, lengths in [(3, [5, 6, 7, 8]), (4, [6, 7, 8])]:
+            for combo in _COLOR_PERMUTATIONS[cycle_len]:
+                for length in lengths:
+                    yield TaskDef(6, combo, length)
+    
+    def _enumerate_direction_cycle_tasks(self) -> Iterator[TaskDef]:
+        """Type 7: Direction Cycle."""
         position_sets_3 = [
             ['top', 'bottom', 'left'], ['left', 'right', 'top'], ['top', 'bottom', 'right'],
             ['top-left', 'bottom-right', 'top-right'], ['top-right', 'bottom-left', 'top-left'],
@@ -315,37 +394,25 @@ class TaskGenerator(BaseGenerator):
             ['top', 'bottom', 'left', 'right', 'center']
         ]
         
-        for cycle in position_sets_3:
-            for length in [5, 6, 7, 8]:
-                task_params = {'cycle': cycle, 'length': length}
-                all_tasks.append(('direction_cycle', 7, task_params))
-        
-        for cycle in position_sets_4:
-            for length in [6, 7, 8]:
-                task_params = {'cycle': cycle, 'length': length}
-                all_tasks.append(('direction_cycle', 7, task_params))
-        
-        for cycle in position_sets_5:
-            for length in [7, 8]:
-                task_params = {'cycle': cycle, 'length': length}
-                all_tasks.append(('direction_cycle', 7, task_params))
-        
-        # Type 8: Mixed Sequence (Color + Shape)
-        color_shape_cycles = []
-        limit_reached = False
-        for color_combo in permutations(COLORS, 3):
-            if limit_reached:
-                break
-            for shape_combo in permutations(SHAPE_MAP.keys(), 3):
-                cycle = [f"{color}{shape}" for color, shape in zip(color_combo, shape_combo)]
-                color_shape_cycles.append(cycle)
-                if len(color_shape_cycles) >= 48:
-                    limit_reached = True
-                    break
-        
-        for cycle in color_shape_cycles:
+        for position_sets, lengths in [(position_sets_3, [5, 6, 7, 8]),
+                                       (position_sets_4, [6, 7, 8]),
+                                       (position_sets_5, [7, 8])]:
+            for cycle in position_sets:
+                cycle = _intern_cycle(cycle)
+                for length in lengths:
+                    yield TaskDef(7, cycle, length)
+    
+    def _enumerate_mixed_tasks(self) -> Iterator[TaskDef]:
+        """Type 8: Mixed Sequence (Color + Shape)."""
+        # 48 distinct color/shape permutation pairs, drawn by flat pair index so the
+        # full product is never built (taking the first 48 only ever used one color cycle)
+        color_combos, shape_combos = _COLOR_PERMUTATIONS[3], _SHAPE_PERMUTATIONS[3]
+        num_shape_combos = len(shape_combos)
+        pair_indices = sorted(random.sample(range(len(color_combos) * num_shape_combos), 48))
+        for pair_index in pair_indices:
+            color_index, shape_index = divmod(pair_index, num_shape_combos)
+            color_combo = color_combos[color_index]
+            shape_combo = shape_combos[shape_index]
+            cycle = _intern_cycle(zip(color_combo, shape_combo))
             for length in [6, 7, 8]:
-                task_params = {'cycle': cycle, 'length': length, 'mixed_type': 'color_shape'}
-                all_tasks.append(('mixed', 8, task_params))
-        
-        return all_tasks
+                yield TaskDef(8, cycle, length, 'color_shape')
@@ -64,6 +64,8 @@ def get_prompt(task_type: str = "default") -> str:
         Random prompt string from the specified type
     """
     prompts = PROMPTS.get(task_type, PROMPTS["default"])
+    if len(prompts) == 1:
+        return prompts[0]
     return random.choice(prompts)
 
 